@@ -8,7 +8,7 @@ from urllib.parse import urljoin, urlparse
 import duckdb
 import requests
 import typer
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from m3.config import (
     get_dataset_config,
@@ -82,7 +82,10 @@ def _scrape_urls_from_html_page(
     try:
         page_response = session.get(page_url, timeout=30)
         page_response.raise_for_status()
-        soup = BeautifulSoup(page_response.content, "html.parser")
+        # Only anchors matter; skip building the rest of the document tree
+        soup = BeautifulSoup(
+            page_response.content, "html.parser", parse_only=SoupStrainer("a")
+        )
         for link_tag in soup.find_all("a", href=True):
             href_path = link_tag["href"]
             # Basic validation of the link
@@ -0,0 +1,23 @@
+"""Shared pytest fixtures."""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def clean_m3_env(monkeypatch):
+    """Start a test without any M3_* variables from the host."""
+    for key in [k for k in os.environ if k.startswith("M3_")]:
+        monkeypatch.delenv(key)
+
+
+@pytest.fixture
+def set_env(monkeypatch):
+    """Return a helper that sets a dict of environment variables for one test."""
+
+    def _set_env(env_vars):
+        for key, value in env_vars.items():
+            monkeypatch.setenv(key, value)
+
+    return _set_env
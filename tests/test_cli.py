@@ -1,5 +1,4 @@
 import subprocess
-import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -11,24 +10,37 @@ from m3.cli import app
 
 runner = CliRunner()
 
+# Stand-in for a successful subprocess.run(); only .returncode is read by the CLI
+_COMPLETED = subprocess.CompletedProcess(args=[], returncode=0)
 
-@pytest.fixture(autouse=True)
-def inject_version(monkeypatch):
-    monkeypatch.setattr(cli_module, "__version__", "0.0.1")
 
+@pytest.fixture(autouse=True, scope="module")
+def inject_version():
+    # The function-scoped monkeypatch fixture can't back a module-scoped fixture
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(cli_module, "__version__", "0.0.1")
+        yield
 
-def test_help_shows_app_name():
-    result = runner.invoke(app, ["--help"])
-    # exit code 0 for successful help display
-    assert result.exit_code == 0
-    # help output contains the app name
-    assert "M3 CLI" in result.stdout
+
+@pytest.fixture
+def mock_subprocess(monkeypatch):
+    """Replace subprocess.run so config commands never spawn the helper scripts."""
+    mock_run = MagicMock(return_value=_COMPLETED)
+    monkeypatch.setattr(subprocess, "run", mock_run)
+    return mock_run
 
 
-def test_version_option_exits_zero_and_shows_version():
-    result = runner.invoke(app, ["--version"])
+@pytest.mark.parametrize(
+    "argv,needle",
+    [
+        (["--help"], "M3 CLI"),
+        (["--version"], "M3 CLI Version: 0.0.1"),
+    ],
+)
+def test_simple_commands_exit_zero(argv, needle):
+    result = runner.invoke(app, argv)
     assert result.exit_code == 0
-    assert "M3 CLI Version: 0.0.1" in result.stdout
+    assert needle in result.stdout
 
 
 def test_unknown_command_reports_error():
@@ -44,74 +56,73 @@ def test_unknown_command_reports_error():
     )
 
 
+@patch("m3.cli.set_active_dataset")
 @patch("m3.cli.init_duckdb_from_parquet")
 @patch("m3.cli.verify_table_rowcount")
-def test_init_command_duckdb_custom_path(mock_rowcount, mock_init):
+def test_init_command_duckdb_custom_path(
+    mock_rowcount, mock_init, mock_set_active, tmp_path
+):
     """Test that m3 init --db-path uses custom database path override and DuckDB flow."""
     mock_init.return_value = True
     mock_rowcount.return_value = 100
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        custom_db_path = Path(temp_dir) / "custom_mimic.duckdb"
-        resolved_custom_db_path = custom_db_path.resolve()
-        # Also ensure a deterministic parquet path exists for the dataset discovery.
-        with patch("m3.cli.get_dataset_parquet_root") as mock_parquet_root:
-            repo_root = Path(__file__).resolve().parents[1]
-            mock_parquet_root.return_value = repo_root / "m3_data/parquet/mimic-iv-demo"
-            with patch.object(Path, "exists", return_value=True):
-                result = runner.invoke(
-                    app, ["init", "mimic-iv-demo", "--db-path", str(custom_db_path)]
-                )
-
-        assert result.exit_code == 0
-        assert (
-            str(custom_db_path) in result.stdout
-            or str(resolved_custom_db_path) in result.stdout
+    custom_db_path = tmp_path / "custom_mimic.duckdb"
+    resolved_custom_db_path = custom_db_path.resolve()
+    # A real Parquet root with one file makes init skip download and conversion
+    parquet_root = tmp_path / "parquet" / "mimic-iv-demo"
+    (parquet_root / "hosp").mkdir(parents=True)
+    (parquet_root / "hosp" / "admissions.parquet").touch()
+    with patch("m3.cli.get_dataset_parquet_root", return_value=parquet_root):
+        result = runner.invoke(
+            app, ["init", "mimic-iv-demo", "--db-path", str(custom_db_path)]
         )
-        assert "DuckDB path:" in result.stdout
-
-        # initializer should be called with the resolved path
-        mock_init.assert_called_once_with(
-            dataset_name="mimic-iv-demo", db_target_path=resolved_custom_db_path
-        )
-        # verification query should be attempted
-        mock_rowcount.assert_called()
-
 
-def test_config_validation_bigquery_with_db_path():
-    """Test that bigquery backend rejects db-path parameter."""
-    result = runner.invoke(
-        app, ["config", "claude", "--backend", "bigquery", "--db-path", "/test/path"]
+    assert result.exit_code == 0
+    assert (
+        str(custom_db_path) in result.stdout
+        or str(resolved_custom_db_path) in result.stdout
     )
-    # should fail when db-path is provided with bigquery
-    assert result.exit_code == 1
-    assert "db-path can only be used with --backend duckdb" in result.output
-
-
-def test_config_validation_bigquery_requires_project_id():
-    """Test that bigquery backend requires project-id parameter."""
-    result = runner.invoke(app, ["config", "claude", "--backend", "bigquery"])
-    # missing project-id should fail for bigquery backend
-    assert result.exit_code == 1
-    assert "project-id is required when using --backend bigquery" in result.output
-
+    assert "DuckDB path:" in result.stdout
 
-def test_config_validation_duckdb_with_project_id():
-    """Test that duckdb backend rejects project-id parameter."""
-    result = runner.invoke(
-        app, ["config", "claude", "--backend", "duckdb", "--project-id", "test"]
+    # initializer should be called with the resolved path
+    mock_init.assert_called_once_with(
+        dataset_name="mimic-iv-demo", db_target_path=resolved_custom_db_path
     )
-    # should fail when project-id is provided with duckdb
+    # verification query should be attempted
+    mock_rowcount.assert_called()
+    mock_set_active.assert_called_once_with("demo")
+
+
+@pytest.mark.parametrize(
+    "args,expected_msg",
+    [
+        # bigquery backend rejects db-path
+        (
+            ["config", "claude", "--backend", "bigquery", "--db-path", "/test/path"],
+            "db-path can only be used with --backend duckdb",
+        ),
+        # bigquery backend requires project-id
+        (
+            ["config", "claude", "--backend", "bigquery"],
+            "project-id is required when using --backend bigquery",
+        ),
+        # duckdb backend rejects project-id
+        (
+            ["config", "claude", "--backend", "duckdb", "--project-id", "test"],
+            "project-id can only be used with --backend bigquery",
+        ),
+    ],
+)
+def test_config_validation(args, expected_msg):
+    """Test that invalid backend/option combinations are rejected."""
+    result = runner.invoke(app, args)
     assert result.exit_code == 1
-    # Check output - error messages from typer usually go to stdout
-    assert "project-id can only be used with --backend bigquery" in result.output
+    # error messages from typer usually go to stdout
+    assert expected_msg in result.output
 
 
-@patch("subprocess.run")
 def test_config_claude_success(mock_subprocess):
     """Test successful Claude Desktop configuration."""
-    mock_subprocess.return_value = MagicMock(returncode=0)
-
     result = runner.invoke(app, ["config", "claude"])
     assert result.exit_code == 0
     assert "Claude Desktop configuration completed" in result.stdout
@@ -122,11 +133,8 @@ def test_config_claude_success(mock_subprocess):
     assert "setup_claude_desktop.py" in call_args[1]
 
 
-@patch("subprocess.run")
 def test_config_universal_quick_mode(mock_subprocess):
     """Test universal config generator in quick mode."""
-    mock_subprocess.return_value = MagicMock(returncode=0)
-
     result = runner.invoke(app, ["config", "--quick"])
     assert result.exit_code == 0
     assert "Generating M3 MCP configuration" in result.stdout
@@ -137,7 +145,6 @@ def test_config_universal_quick_mode(mock_subprocess):
     assert "--quick" in call_args
 
 
-@patch("subprocess.run")
 def test_config_script_failure(mock_subprocess):
     """Test error handling when config script fails."""
     mock_subprocess.side_effect = subprocess.CalledProcessError(1, "cmd")
@@ -149,15 +156,20 @@ def test_config_script_failure(mock_subprocess):
     # The specific error message may vary
 
 
-@patch("subprocess.run")
+@pytest.mark.parametrize(
+    "active_dataset,inferred_path",
+    [
+        (None, "/tmp/inferred-demo.duckdb"),  # unset -> default to demo
+        ("full", "/tmp/inferred-full.duckdb"),
+    ],
+)
 @patch("m3.cli.get_default_database_path")
 @patch("m3.cli.get_active_dataset")
-def test_config_claude_infers_db_path_demo(
-    mock_active, mock_get_default, mock_subprocess
+def test_config_claude_infers_db_path(
+    mock_active, mock_get_default, mock_subprocess, active_dataset, inferred_path
 ):
-    mock_active.return_value = None  # unset -> default to demo
-    mock_get_default.return_value = Path("/tmp/inferred-demo.duckdb")
-    mock_subprocess.return_value = MagicMock(returncode=0)
+    mock_active.return_value = active_dataset
+    mock_get_default.return_value = Path(inferred_path)
 
     result = runner.invoke(app, ["config", "claude"])
     assert result.exit_code == 0
@@ -165,30 +177,12 @@ def test_config_claude_infers_db_path_demo(
     # subprocess run should be called with inferred --db-path
     call_args = mock_subprocess.call_args[0][0]
     assert "--db-path" in call_args
-    assert "/tmp/inferred-demo.duckdb" in call_args
+    assert inferred_path in call_args
 
-    # Should have asked for demo duckdb path
+    # Should have asked for the default duckdb path
     mock_get_default.assert_called()
 
 
-@patch("subprocess.run")
-@patch("m3.cli.get_default_database_path")
-@patch("m3.cli.get_active_dataset")
-def test_config_claude_infers_db_path_full(
-    mock_active, mock_get_default, mock_subprocess
-):
-    mock_active.return_value = "full"
-    mock_get_default.return_value = Path("/tmp/inferred-full.duckdb")
-    mock_subprocess.return_value = MagicMock(returncode=0)
-
-    result = runner.invoke(app, ["config", "claude"])
-    assert result.exit_code == 0
-
-    call_args = mock_subprocess.call_args[0][0]
-    assert "--db-path" in call_args
-    assert "/tmp/inferred-full.duckdb" in call_args
-
-
 @patch("m3.cli.set_active_dataset")
 @patch("m3.cli.detect_available_local_datasets")
 def test_use_full_happy_path(mock_detect, mock_set_active):
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import m3.config as cfg_mod
 from m3.config import (
     get_dataset_config,
     get_dataset_parquet_root,
@@ -19,8 +20,6 @@ def test_get_dataset_config_unknown():
 
 def test_default_paths(tmp_path, monkeypatch):
     # Redirect default dirs to a temp location
-    import m3.config as cfg_mod
-
     monkeypatch.setattr(cfg_mod, "_DEFAULT_DATABASES_DIR", tmp_path / "dbs")
     monkeypatch.setattr(cfg_mod, "_DEFAULT_PARQUET_DIR", tmp_path / "parquet")
     db_path = get_default_database_path("mimic-iv-demo")
@@ -33,8 +32,6 @@ def test_default_paths(tmp_path, monkeypatch):
 
 
 def test_raw_path_includes_dataset_name(tmp_path, monkeypatch):
-    import m3.config as cfg_mod
-
     monkeypatch.setattr(cfg_mod, "_DEFAULT_PARQUET_DIR", tmp_path / "parquet")
     raw_path = get_dataset_parquet_root("mimic-iv-demo")
     assert "mimic-iv-demo" in str(raw_path)
@@ -1,8 +1,8 @@
 """Tests for MCP configuration scripts."""
 
+import copy
 import sys
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 
@@ -11,108 +11,92 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from m3.mcp_client_configs.dynamic_mcp_config import MCPConfigGenerator
 
 
+@pytest.fixture(scope="module")
+def base_generator():
+    """Build one generator per module; __init__ walks the filesystem."""
+    return MCPConfigGenerator()
+
+
+@pytest.fixture
+def generator(base_generator, monkeypatch):
+    """Per-test copy of the base generator with path validation stubbed out."""
+    g = copy.copy(base_generator)
+    monkeypatch.setattr(g, "_validate_python_path", lambda path: True)
+    monkeypatch.setattr(g, "_validate_directory", lambda path: True)
+    return g
+
+
 class TestMCPConfigGenerator:
     """Test the MCPConfigGenerator class."""
 
-    def test_generate_config_duckdb_default(self):
+    def test_generate_config_duckdb_default(self, generator):
         """Test generating DuckDB config with defaults."""
-        generator = MCPConfigGenerator()
-
-        with (
-            patch.object(generator, "_validate_python_path", return_value=True),
-            patch.object(generator, "_validate_directory", return_value=True),
-        ):
-            config = generator.generate_config()
+        config = generator.generate_config()
 
-            assert config["mcpServers"]["m3"]["env"]["M3_BACKEND"] == "duckdb"
-            assert "M3_PROJECT_ID" not in config["mcpServers"]["m3"]["env"]
-            assert config["mcpServers"]["m3"]["args"] == ["-m", "m3.mcp_server"]
+        assert config["mcpServers"]["m3"]["env"]["M3_BACKEND"] == "duckdb"
+        assert "M3_PROJECT_ID" not in config["mcpServers"]["m3"]["env"]
+        assert config["mcpServers"]["m3"]["args"] == ["-m", "m3.mcp_server"]
 
-    def test_generate_config_bigquery_with_project(self):
+    def test_generate_config_bigquery_with_project(self, generator):
         """Test generating BigQuery config with project ID."""
-        generator = MCPConfigGenerator()
-
-        with (
-            patch.object(generator, "_validate_python_path", return_value=True),
-            patch.object(generator, "_validate_directory", return_value=True),
-        ):
-            config = generator.generate_config(
-                backend="bigquery", project_id="test-project"
-            )
-
-            assert config["mcpServers"]["m3"]["env"]["M3_BACKEND"] == "bigquery"
-            assert config["mcpServers"]["m3"]["env"]["M3_PROJECT_ID"] == "test-project"
-            assert (
-                config["mcpServers"]["m3"]["env"]["GOOGLE_CLOUD_PROJECT"]
-                == "test-project"
-            )
-
-    def test_generate_config_duckdb_with_db_path(self):
+        config = generator.generate_config(
+            backend="bigquery", project_id="test-project"
+        )
+
+        assert config["mcpServers"]["m3"]["env"]["M3_BACKEND"] == "bigquery"
+        assert config["mcpServers"]["m3"]["env"]["M3_PROJECT_ID"] == "test-project"
+        assert (
+            config["mcpServers"]["m3"]["env"]["GOOGLE_CLOUD_PROJECT"] == "test-project"
+        )
+
+    def test_generate_config_duckdb_with_db_path(self, generator):
         """Test generating DuckDB config with custom database path."""
-        generator = MCPConfigGenerator()
-
-        with (
-            patch.object(generator, "_validate_python_path", return_value=True),
-            patch.object(generator, "_validate_directory", return_value=True),
-        ):
-            config = generator.generate_config(
-                backend="duckdb", db_path="/custom/path/database.duckdb"
-            )
-
-            assert config["mcpServers"]["m3"]["env"]["M3_BACKEND"] == "duckdb"
-            assert (
-                config["mcpServers"]["m3"]["env"]["M3_DB_PATH"]
-                == "/custom/path/database.duckdb"
-            )
-
-    def test_generate_config_custom_server_name(self):
-        """Test generating config with custom server name."""
-        generator = MCPConfigGenerator()
+        config = generator.generate_config(
+            backend="duckdb", db_path="/custom/path/database.duckdb"
+        )
 
-        with (
-            patch.object(generator, "_validate_python_path", return_value=True),
-            patch.object(generator, "_validate_directory", return_value=True),
-        ):
-            config = generator.generate_config(server_name="custom-m3")
+        assert config["mcpServers"]["m3"]["env"]["M3_BACKEND"] == "duckdb"
+        assert (
+            config["mcpServers"]["m3"]["env"]["M3_DB_PATH"]
+            == "/custom/path/database.duckdb"
+        )
+
+    def test_generate_config_custom_server_name(self, generator):
+        """Test generating config with custom server name."""
+        config = generator.generate_config(server_name="custom-m3")
 
-            assert "custom-m3" in config["mcpServers"]
-            assert "m3" not in config["mcpServers"]
+        assert "custom-m3" in config["mcpServers"]
+        assert "m3" not in config["mcpServers"]
 
-    def test_generate_config_additional_env_vars(self):
+    def test_generate_config_additional_env_vars(self, generator):
         """Test generating config with additional environment variables."""
-        generator = MCPConfigGenerator()
-
-        with (
-            patch.object(generator, "_validate_python_path", return_value=True),
-            patch.object(generator, "_validate_directory", return_value=True),
-        ):
-            config = generator.generate_config(
-                additional_env={"DEBUG": "true", "LOG_LEVEL": "info"}
-            )
-
-            env = config["mcpServers"]["m3"]["env"]
-            assert env["DEBUG"] == "true"
-            assert env["LOG_LEVEL"] == "info"
-            assert env["M3_BACKEND"] == "duckdb"  # Default should still be there
-
-    def test_validation_invalid_python_path(self):
-        """Test that invalid Python path raises error."""
-        generator = MCPConfigGenerator()
-
-        with (
-            patch.object(generator, "_validate_python_path", return_value=False),
-            patch.object(generator, "_validate_directory", return_value=True),
-        ):
-            with pytest.raises(ValueError, match="Invalid Python path"):
-                generator.generate_config(python_path="/invalid/python")
-
-    def test_validation_invalid_directory(self):
-        """Test that invalid working directory raises error."""
-        generator = MCPConfigGenerator()
-
-        with (
-            patch.object(generator, "_validate_python_path", return_value=True),
-            patch.object(generator, "_validate_directory", return_value=False),
-        ):
-            with pytest.raises(ValueError, match="Invalid working directory"):
-                generator.generate_config(working_directory="/invalid/dir")
+        config = generator.generate_config(
+            additional_env={"DEBUG": "true", "LOG_LEVEL": "info"}
+        )
+
+        env = config["mcpServers"]["m3"]["env"]
+        assert env["DEBUG"] == "true"
+        assert env["LOG_LEVEL"] == "info"
+        assert env["M3_BACKEND"] == "duckdb"  # Default should still be there
+
+    @pytest.mark.parametrize(
+        "kwargs,python_ok,directory_ok,msg",
+        [
+            ({"python_path": "/invalid/python"}, False, True, "Invalid Python path"),
+            (
+                {"working_directory": "/invalid/dir"},
+                True,
+                False,
+                "Invalid working directory",
+            ),
+        ],
+    )
+    def test_validation_invalid_inputs(
+        self, generator, monkeypatch, kwargs, python_ok, directory_ok, msg
+    ):
+        """Test that an invalid Python path or working directory raises an error."""
+        monkeypatch.setattr(generator, "_validate_python_path", lambda path: python_ok)
+        monkeypatch.setattr(generator, "_validate_directory", lambda path: directory_ok)
+
+        with pytest.raises(ValueError, match=msg):
+            generator.generate_config(**kwargs)
@@ -1,7 +1,9 @@
 import gzip
+from types import SimpleNamespace
 from unittest import mock
 
 import duckdb
+import pytest
 import requests
 
 from m3.data_io import (
@@ -14,21 +16,51 @@ from m3.data_io import (
 )
 
 
-def test_compute_parquet_dir_size_empty(tmp_path):
-    size = compute_parquet_dir_size(tmp_path)
+@pytest.fixture(scope="module")
+def empty_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("empty")
+
+
+def test_compute_parquet_dir_size_empty(empty_dir):
+    size = compute_parquet_dir_size(empty_dir)
     assert size == 0
 
 
-def test_verify_table_rowcount_with_temp_duckdb(tmp_path):
-    db_path = tmp_path / "test.duckdb"
-    con = duckdb.connect(str(db_path))
-    try:
-        con.execute("CREATE VIEW temp_numbers AS SELECT 1 AS x UNION ALL SELECT 2 AS x")
-        con.commit()
-    finally:
-        con.close()
+def _write_gz_csv(path, text):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(text)
 
-    count = verify_table_rowcount(db_path, "temp_numbers")
+
+@pytest.fixture(scope="module")
+def parquet_env(tmp_path_factory):
+    """Convert a minimal CSV.gz to Parquet and build DuckDB views over it once."""
+    root = tmp_path_factory.mktemp("data_io")
+
+    # Prepare a minimal CSV.gz under hosp/
+    src_root = root / "src"
+    hosp_dir = src_root / "hosp"
+    hosp_dir.mkdir(parents=True, exist_ok=True)
+    _write_gz_csv(
+        hosp_dir / "sample.csv.gz",
+        "col1,col2\n"  # header
+        "1,foo\n"
+        "2,bar\n",
+    )
+
+    # Convert to Parquet under dst root
+    dst_root = root / "parquet"
+    assert convert_csv_to_parquet("mimic-iv-demo", src_root, dst_root)
+
+    # Initialize DuckDB views, patching the parquet root resolver
+    db_path = root / "test.duckdb"
+    with mock.patch("m3.data_io.get_dataset_parquet_root", return_value=dst_root):
+        assert init_duckdb_from_parquet("mimic-iv-demo", db_path)
+
+    return SimpleNamespace(dst=dst_root, db=db_path)
+
+
+def test_verify_table_rowcount_with_temp_duckdb(parquet_env):
+    count = verify_table_rowcount(parquet_env.db, "hosp_sample")
     assert count == 2
 
 
@@ -51,31 +83,38 @@ class DummyResponse:
     def reason(self):
         return "Error"
 
-    def iter_content(self, chunk_size=1):
-        yield from self.content
+    def iter_content(self, chunk_size=8192):
+        # Honor chunk_size like requests.Response instead of yielding single bytes
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
 
 
-def test_scrape_urls(monkeypatch):
-    html = (
-        "<html><body>"
-        '<a href="file1.csv.gz">ok</a>'
-        '<a href="skip.txt">no</a>'
-        "</body></html>"
-    )
-    dummy = DummyResponse(html)
+SCRAPE_HTML_WITH_CSV = (
+    '<html><body><a href="file1.csv.gz">ok</a><a href="skip.txt">no</a></body></html>'
+)
+SCRAPE_HTML_WITHOUT_CSV = '<html><body><a href="file1.txt">ok</a></body></html>'
+
+
+@pytest.fixture(scope="module")
+def scrape_session():
     session = requests.Session()
-    monkeypatch.setattr(session, "get", lambda url, timeout=None: dummy)
-    urls = _scrape_urls_from_html_page("http://example.com/", session)
-    assert urls == ["http://example.com/file1.csv.gz"]
+    yield session
+    session.close()
 
 
-def test_scrape_no_matching_suffix(monkeypatch):
-    html = '<html><body><a href="file1.txt">ok</a></body></html>'
+@pytest.mark.parametrize(
+    "html,expected",
+    [
+        (SCRAPE_HTML_WITH_CSV, ["http://example.com/file1.csv.gz"]),
+        (SCRAPE_HTML_WITHOUT_CSV, []),
+    ],
+    ids=["csv-link", "no-matching-suffix"],
+)
+def test_scrape_urls(monkeypatch, scrape_session, html, expected):
     dummy = DummyResponse(html)
-    session = requests.Session()
-    monkeypatch.setattr(session, "get", lambda url, timeout=None: dummy)
-    urls = _scrape_urls_from_html_page("http://example.com/", session)
-    assert urls == []
+    monkeypatch.setattr(scrape_session, "get", lambda url, timeout=None: dummy)
+    urls = _scrape_urls_from_html_page("http://example.com/", scrape_session)
+    assert urls == expected
 
 
 def test_common_user_agent_header():
@@ -89,53 +128,31 @@ def test_common_user_agent_header():
 # ------------------------------------------------------------
 
 
-def _write_gz_csv(path, text):
-    with gzip.open(path, "wt", encoding="utf-8") as f:
-        f.write(text)
-
-
-def test_convert_csv_to_parquet_and_init_duckdb(tmp_path, monkeypatch):
-    # Prepare a minimal CSV.gz under hosp/
-    src_root = tmp_path / "src"
-    hosp_dir = src_root / "hosp"
-    hosp_dir.mkdir(parents=True, exist_ok=True)
-    csv_gz = hosp_dir / "sample.csv.gz"
-
-    _write_gz_csv(
-        csv_gz,
-        "col1,col2\n"  # header
-        "1,foo\n"
-        "2,bar\n",
-    )
+@pytest.fixture(scope="module")
+def duckdb_mem():
+    """One in-memory DuckDB connection shared by the verification queries."""
+    con = duckdb.connect()
+    yield con
+    con.close()
 
-    # Convert to Parquet under dst root
-    dst_root = tmp_path / "parquet"
-    ok = convert_csv_to_parquet("mimic-iv-demo", src_root, dst_root)
-    assert ok  # conversion succeeded
 
-    out_parquet = dst_root / "hosp" / "sample.parquet"
+def test_convert_csv_to_parquet(parquet_env, duckdb_mem):
+    out_parquet = parquet_env.dst / "hosp" / "sample.parquet"
     assert out_parquet.exists()  # parquet file created
 
     # Quick verify via DuckDB
-    con = duckdb.connect()
-    try:
-        cnt = con.execute(
-            f"SELECT COUNT(*) FROM read_parquet('{out_parquet.as_posix()}')"
-        ).fetchone()[0]
-    finally:
-        con.close()
+    cnt = duckdb_mem.execute(
+        f"SELECT COUNT(*) FROM read_parquet('{out_parquet.as_posix()}')"
+    ).fetchone()[0]
     assert cnt == 2  # two data rows
 
-    # Initialize DuckDB views, patching the parquet root resolver
-    db_path = tmp_path / "test.duckdb"
-    with mock.patch("m3.data_io.get_dataset_parquet_root", return_value=dst_root):
-        init_ok = init_duckdb_from_parquet("mimic-iv-demo", db_path)
-    assert init_ok  # views created
 
-    # Query the created view name hosp_sample
-    con = duckdb.connect(str(db_path))
+def test_init_duckdb_from_parquet(parquet_env, duckdb_mem):
+    # Attach the built database instead of opening a second connection
+    duckdb_mem.execute(f"ATTACH '{parquet_env.db.as_posix()}' AS t (READ_ONLY)")
     try:
-        cnt = con.execute("SELECT COUNT(*) FROM hosp_sample").fetchone()[0]
+        # Query the created view name hosp_sample
+        cnt = duckdb_mem.execute("SELECT COUNT(*) FROM t.hosp_sample").fetchone()[0]
     finally:
-        con.close()
+        duckdb_mem.execute("DETACH t")
     assert cnt == 2
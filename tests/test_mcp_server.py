@@ -2,27 +2,87 @@
 Tests for the MCP server functionality.
 """
 
+import asyncio
+import functools
+import importlib.util
 import os
+import re
+import tempfile
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
+import duckdb
 import pytest
+import pytest_asyncio
 from fastmcp import Client
 
-# Mock the database path check during import to handle CI environments
-with patch("pathlib.Path.exists", return_value=True):
-    with patch(
-        "m3.mcp_server.get_default_database_path",
-        return_value=Path("/fake/test.duckdb"),
+# m3.mcp_server initializes its backend at import time; point it at a real
+# (empty) file instead of patching Path.exists for the whole process
+with tempfile.NamedTemporaryFile(suffix=".duckdb") as _import_db:
+    with patch.dict(
+        os.environ,
+        {
+            "M3_BACKEND": "duckdb",
+            "M3_DB_PATH": _import_db.name,
+            "M3_OAUTH2_ENABLED": "false",
+        },
     ):
-        from m3.mcp_server import _init_backend, mcp
+        from m3.mcp_server import _init_backend, main, mcp
+
+# Keep host M3_* variables (backend, DB path, OAuth2) out of every test
+pytestmark = pytest.mark.usefixtures("clean_m3_env")
+
+# Default database path that does not exist, for the missing-database test
+_FAKE_DUCKDB = Path("/fake/path.duckdb")
+
+# Backend environments shared by the tests; M3_DB_PATH is added per test
+DUCKDB_ENV = {"M3_BACKEND": "duckdb", "M3_OAUTH2_ENABLED": "false"}
+BIGQUERY_ENV = {"M3_BACKEND": "bigquery", "M3_PROJECT_ID": "test-project"}
+
+# Write/DDL statements execute_mimic_query must reject before reaching the DB
+DANGEROUS_QUERIES = [
+    "UPDATE icu_icustays SET subject_id = 999",
+    "DELETE FROM icu_icustays",
+    "INSERT INTO icu_icustays VALUES (1, 2, 3, '2020-01-01', '2020-01-02')",
+    "DROP TABLE icu_icustays",
+    "CREATE TABLE test (id INTEGER)",
+    "ALTER TABLE icu_icustays ADD COLUMN test TEXT",
+]
+SECURITY_ERROR_RE = re.compile(r"Security Error:.*Only SELECT", re.DOTALL)
+
+
+def _result_text(result):
+    """Return the text blocks of a CallToolResult without repr-ing the model."""
+    return "".join(
+        block.text for block in result.content if getattr(block, "text", None)
+    )
+
+
+@pytest.fixture
+def bq_mock(monkeypatch):
+    """Mock bigquery.Client; the instance it returns answers every query."""
+    mock_df = MagicMock()
+    mock_df.empty = False
+    mock_df.to_string.return_value = "Mock BigQuery result"
+    mock_df.__len__.return_value = 5
+
+    mock_job = Mock()
+    mock_job.to_dataframe.return_value = mock_df
+
+    mock_client_instance = Mock()
+    mock_client_instance.query.return_value = mock_job
 
+    mock_client = Mock(return_value=mock_client_instance)
+    monkeypatch.setattr("google.cloud.bigquery.Client", mock_client)
+    return mock_client
 
+
+# Installed packages don't change mid-run, so one find_spec per process is enough
+@functools.cache
 def _bigquery_available():
     """Check if BigQuery dependencies are available."""
+    # find_spec imports parent packages, so a missing "google" raises
     try:
-        import importlib.util
-
         return importlib.util.find_spec("google.cloud.bigquery") is not None
     except ImportError:
         return False
@@ -36,69 +96,68 @@ class TestMCPServerSetup:
         assert mcp is not None
         assert mcp.name == "m3"
 
-    def test_backend_init_duckdb_default(self):
+    def test_backend_init_duckdb_default(self, monkeypatch, set_env, tmp_path):
         """Test DuckDB backend initialization with defaults."""
-        with patch.dict(os.environ, {"M3_BACKEND": "duckdb"}, clear=True):
-            with patch("m3.mcp_server.get_default_database_path") as mock_path:
-                mock_path.return_value = Path("/fake/path.duckdb")
-                with patch("pathlib.Path.exists", return_value=True):
-                    _init_backend()
-                    # If no exception raised, initialization succeeded
-
-    def test_backend_init_duckdb_custom_path(self):
+        db_path = tmp_path / "default.duckdb"
+        db_path.touch()
+        set_env(DUCKDB_ENV)
+        monkeypatch.setattr(
+            "m3.mcp_server.get_default_database_path", lambda dataset: db_path
+        )
+        _init_backend()
+        # If no exception raised, initialization succeeded
+
+    def test_backend_init_duckdb_custom_path(self, set_env, tmp_path):
         """Test DuckDB backend initialization with custom path."""
-        with patch.dict(
-            os.environ,
-            {"M3_BACKEND": "duckdb", "M3_DB_PATH": "/custom/path.duckdb"},
-            clear=True,
-        ):
-            with patch("pathlib.Path.exists", return_value=True):
-                _init_backend()
-                # If no exception raised, initialization succeeded
-
-    def test_backend_init_duckdb_missing_db(self):
+        db_path = tmp_path / "custom.duckdb"
+        db_path.touch()
+        set_env({**DUCKDB_ENV, "M3_DB_PATH": str(db_path)})
+        _init_backend()
+        # If no exception raised, initialization succeeded
+
+    def test_backend_init_duckdb_missing_db(self, monkeypatch, set_env):
         """Test DuckDB backend initialization with missing database."""
-        with patch.dict(os.environ, {"M3_BACKEND": "duckdb"}, clear=True):
-            with patch("m3.mcp_server.get_default_database_path") as mock_path:
-                mock_path.return_value = Path("/fake/path.duckdb")
-                with patch("pathlib.Path.exists", return_value=False):
-                    with pytest.raises(FileNotFoundError):
-                        _init_backend()
+        set_env(DUCKDB_ENV)
+        monkeypatch.setattr(
+            "m3.mcp_server.get_default_database_path", lambda dataset: _FAKE_DUCKDB
+        )
+        with pytest.raises(FileNotFoundError):
+            _init_backend()
 
     @pytest.mark.skipif(
         not _bigquery_available(), reason="BigQuery dependencies not available"
     )
-    def test_backend_init_bigquery(self):
+    def test_backend_init_bigquery(self, set_env, bq_mock):
         """Test BigQuery backend initialization."""
-        with patch.dict(
-            os.environ,
-            {"M3_BACKEND": "bigquery", "M3_PROJECT_ID": "test-project"},
-            clear=True,
-        ):
-            with patch("google.cloud.bigquery.Client") as mock_client:
-                mock_client.return_value = Mock()
-                _init_backend()
-                # If no exception raised, initialization succeeded
-                mock_client.assert_called_once_with(project="test-project")
-
-    def test_backend_init_invalid(self):
+        set_env(BIGQUERY_ENV)
+        _init_backend()
+        # If no exception raised, initialization succeeded
+        bq_mock.assert_called_once_with(project="test-project")
+
+    def test_backend_init_invalid(self, monkeypatch):
         """Test initialization with invalid backend."""
-        with patch.dict(os.environ, {"M3_BACKEND": "invalid"}, clear=True):
-            with pytest.raises(ValueError, match="Unsupported backend"):
-                _init_backend()
+        monkeypatch.setenv("M3_BACKEND", "invalid")
+        with pytest.raises(ValueError, match="Unsupported backend"):
+            _init_backend()
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def mcp_client():
+    """One in-process FastMCP client shared by the DuckDB tool tests."""
+    async with Client(mcp) as client:
+        yield client
 
 
 class TestMCPTools:
     """Test MCP tools functionality."""
 
-    @pytest.fixture
-    def test_db(self, tmp_path):
-        """Create a test DuckDB database."""
-        import duckdb
-
-        db_path = tmp_path / "test.duckdb"
+    @pytest.fixture(scope="module")
+    def test_db(self, tmp_path_factory):
+        """Create a test DuckDB database once; every consumer only reads it."""
+        db_path = tmp_path_factory.mktemp("db") / "test.duckdb"
         con = duckdb.connect(str(db_path))
         try:
+            # One multi-statement script: a single parse/execute round trip
             con.execute(
                 """
                 CREATE TABLE icu_icustays (
@@ -107,191 +166,117 @@ class TestMCPTools:
                     stay_id INTEGER,
                     intime TIMESTAMP,
                     outtime TIMESTAMP
-                )
-                """
-            )
-            con.execute(
-                """
+                );
                 INSERT INTO icu_icustays (subject_id, hadm_id, stay_id, intime, outtime) VALUES
                     (10000032, 20000001, 30000001, '2180-07-23 15:00:00', '2180-07-24 12:00:00'),
-                    (10000033, 20000002, 30000002, '2180-08-15 10:30:00', '2180-08-16 14:15:00')
-                """
-            )
-            con.execute(
-                """
+                    (10000033, 20000002, 30000002, '2180-08-15 10:30:00', '2180-08-16 14:15:00');
                 CREATE TABLE hosp_labevents (
                     subject_id INTEGER,
                     hadm_id INTEGER,
                     itemid INTEGER,
                     charttime TIMESTAMP,
                     value TEXT
-                )
-                """
-            )
-            con.execute(
-                """
+                );
                 INSERT INTO hosp_labevents (subject_id, hadm_id, itemid, charttime, value) VALUES
                     (10000032, 20000001, 50912, '2180-07-23 16:00:00', '120'),
-                    (10000033, 20000002, 50912, '2180-08-15 11:00:00', '95')
+                    (10000033, 20000002, 50912, '2180-08-15 11:00:00', '95');
                 """
             )
-            con.commit()
         finally:
             con.close()
 
         return str(db_path)
 
-    @pytest.mark.asyncio
-    async def test_tools_via_client(self, test_db):
-        """Test MCP tools through the FastMCP client."""
-        # Set up environment for DuckDB backend with OAuth2 disabled
-        with patch.dict(
-            os.environ,
-            {
-                "M3_BACKEND": "duckdb",
-                "M3_DB_PATH": test_db,
-                "M3_OAUTH2_ENABLED": "false",
-            },
-            clear=True,
-        ):
-            # Initialize backend
-            _init_backend()
+    @pytest.fixture
+    def duckdb_backend(self, test_db, set_env):
+        """Point the server at the test database with OAuth2 disabled."""
+        set_env({**DUCKDB_ENV, "M3_DB_PATH": test_db})
+        _init_backend()
 
-            # Test via FastMCP client
-            async with Client(mcp) as client:
-                # Test execute_mimic_query tool
-                result = await client.call_tool(
-                    "execute_mimic_query",
-                    {"sql_query": "SELECT COUNT(*) as count FROM icu_icustays"},
-                )
-                result_text = str(result)
-                assert "count" in result_text
-                assert "2" in result_text
-
-                # Test get_icu_stays tool
-                result = await client.call_tool(
-                    "get_icu_stays", {"patient_id": 10000032, "limit": 10}
-                )
-                result_text = str(result)
-                assert "10000032" in result_text
-
-                # Test get_lab_results tool
-                result = await client.call_tool(
-                    "get_lab_results", {"patient_id": 10000032, "limit": 20}
-                )
-                result_text = str(result)
-                assert "10000032" in result_text
-
-                # Test get_database_schema tool
-                result = await client.call_tool("get_database_schema", {})
-                result_text = str(result)
-                assert "icu_icustays" in result_text or "hosp_labevents" in result_text
-
-    @pytest.mark.asyncio
-    async def test_security_checks(self, test_db):
+    async def test_tools_via_client(self, duckdb_backend, mcp_client):
+        """Test MCP tools through the FastMCP client."""
+        # The tool calls are independent, so issue them concurrently
+        query, icu_stays, lab_results, schema = await asyncio.gather(
+            mcp_client.call_tool(
+                "execute_mimic_query",
+                {"sql_query": "SELECT COUNT(*) as count FROM icu_icustays"},
+            ),
+            mcp_client.call_tool(
+                "get_icu_stays", {"patient_id": 10000032, "limit": 10}
+            ),
+            mcp_client.call_tool(
+                "get_lab_results", {"patient_id": 10000032, "limit": 20}
+            ),
+            mcp_client.call_tool("get_database_schema", {}),
+        )
+
+        # Test execute_mimic_query tool
+        result_text = _result_text(query)
+        assert "count" in result_text
+        assert "2" in result_text
+
+        # Test get_icu_stays tool
+        assert "10000032" in _result_text(icu_stays)
+
+        # Test get_lab_results tool
+        assert "10000032" in _result_text(lab_results)
+
+        # Test get_database_schema tool
+        result_text = _result_text(schema)
+        assert "icu_icustays" in result_text or "hosp_labevents" in result_text
+
+    @pytest.mark.parametrize(
+        "query",
+        DANGEROUS_QUERIES,
+        ids=["update", "delete", "insert", "drop", "create", "alter"],
+    )
+    async def test_security_checks(self, duckdb_backend, mcp_client, query):
         """Test SQL injection protection."""
-        with patch.dict(
-            os.environ,
-            {
-                "M3_BACKEND": "duckdb",
-                "M3_DB_PATH": test_db,
-                "M3_OAUTH2_ENABLED": "false",
-            },
-            clear=True,
-        ):
-            _init_backend()
-
-            async with Client(mcp) as client:
-                # Test dangerous queries are blocked
-                dangerous_queries = [
-                    "UPDATE icu_icustays SET subject_id = 999",
-                    "DELETE FROM icu_icustays",
-                    "INSERT INTO icu_icustays VALUES (1, 2, 3, '2020-01-01', '2020-01-02')",
-                    "DROP TABLE icu_icustays",
-                    "CREATE TABLE test (id INTEGER)",
-                    "ALTER TABLE icu_icustays ADD COLUMN test TEXT",
-                ]
-
-                for query in dangerous_queries:
-                    result = await client.call_tool(
-                        "execute_mimic_query", {"sql_query": query}
-                    )
-                    result_text = str(result)
-                    assert (
-                        "Security Error:" in result_text
-                        and "Only SELECT" in result_text
-                    )
-
-    @pytest.mark.asyncio
-    async def test_invalid_sql(self, test_db):
-        """Test handling of invalid SQL."""
-        with patch.dict(
-            os.environ,
-            {
-                "M3_BACKEND": "duckdb",
-                "M3_DB_PATH": test_db,
-                "M3_OAUTH2_ENABLED": "false",
-            },
-            clear=True,
-        ):
-            _init_backend()
-
-            async with Client(mcp) as client:
-                result = await client.call_tool(
-                    "execute_mimic_query", {"sql_query": "INVALID SQL QUERY"}
-                )
-                result_text = str(result)
-                assert "Query Failed:" in result_text and "syntax error" in result_text
-
-    @pytest.mark.asyncio
-    async def test_empty_results(self, test_db):
-        """Test handling of queries with no results."""
-        with patch.dict(
-            os.environ,
-            {
-                "M3_BACKEND": "duckdb",
-                "M3_DB_PATH": test_db,
-                "M3_OAUTH2_ENABLED": "false",
-            },
-            clear=True,
-        ):
-            _init_backend()
-
-            async with Client(mcp) as client:
-                result = await client.call_tool(
-                    "execute_mimic_query",
-                    {
-                        "sql_query": "SELECT * FROM icu_icustays WHERE subject_id = 999999"
-                    },
-                )
-                result_text = str(result)
-                assert "No results found" in result_text
+        result = await mcp_client.call_tool("execute_mimic_query", {"sql_query": query})
+        assert SECURITY_ERROR_RE.search(_result_text(result))
+
+    @pytest.mark.parametrize(
+        "sql,expected",
+        [
+            ("INVALID SQL QUERY", ["Query Failed:", "syntax error"]),
+            (
+                "SELECT * FROM icu_icustays WHERE subject_id = 999999",
+                ["No results found"],
+            ),
+        ],
+        ids=["invalid-sql", "empty-result"],
+    )
+    async def test_query_error_messages(
+        self, duckdb_backend, mcp_client, sql, expected
+    ):
+        """Test handling of invalid SQL and of queries with no results."""
+        result = await mcp_client.call_tool("execute_mimic_query", {"sql_query": sql})
+        result_text = _result_text(result)
+        for needle in expected:
+            assert needle in result_text
 
-    @pytest.mark.asyncio
-    async def test_oauth2_authentication_required(self, test_db):
+    async def test_oauth2_authentication_required(self, test_db, set_env):
         """Test that OAuth2 authentication is required when enabled."""
         # Set up environment for DuckDB backend with OAuth2 enabled
-        with patch.dict(
-            os.environ,
+        set_env(
             {
-                "M3_BACKEND": "duckdb",
+                **DUCKDB_ENV,
                 "M3_DB_PATH": test_db,
                 "M3_OAUTH2_ENABLED": "true",
                 "M3_OAUTH2_ISSUER_URL": "https://auth.example.com",
                 "M3_OAUTH2_AUDIENCE": "m3-api",
             },
-            clear=True,
-        ):
-            _init_backend()
-
-            async with Client(mcp) as client:
-                # Test that tools require authentication
-                result = await client.call_tool(
-                    "execute_mimic_query",
-                    {"sql_query": "SELECT COUNT(*) FROM icu_icustays"},
-                )
-                result_text = str(result)
-                assert "Missing OAuth2 access token" in result_text
+        )
+        _init_backend()
+
+        async with Client(mcp) as client:
+            # Test that tools require authentication
+            result = await client.call_tool(
+                "execute_mimic_query",
+                {"sql_query": "SELECT COUNT(*) FROM icu_icustays"},
+            )
+            result_text = _result_text(result)
+            assert "Missing OAuth2 access token" in result_text
 
 
 class TestBigQueryIntegration:
@@ -300,50 +285,31 @@ class TestBigQueryIntegration:
     @pytest.mark.skipif(
         not _bigquery_available(), reason="BigQuery dependencies not available"
     )
-    @pytest.mark.asyncio
-    async def test_bigquery_tools(self):
+    async def test_bigquery_tools(self, set_env, bq_mock):
         """Test BigQuery tools functionality with mocks."""
-        with patch.dict(
-            os.environ,
-            {"M3_BACKEND": "bigquery", "M3_PROJECT_ID": "test-project"},
-            clear=True,
-        ):
-            with patch("google.cloud.bigquery.Client") as mock_client:
-                # Mock BigQuery client and query results
-                mock_job = Mock()
-                mock_df = Mock()
-                mock_df.empty = False
-                mock_df.to_string.return_value = "Mock BigQuery result"
-                mock_df.__len__ = Mock(return_value=5)
-                mock_job.to_dataframe.return_value = mock_df
-
-                mock_client_instance = Mock()
-                mock_client_instance.query.return_value = mock_job
-                mock_client.return_value = mock_client_instance
-
-                _init_backend()
-
-                async with Client(mcp) as client:
-                    # Test execute_mimic_query tool
-                    result = await client.call_tool(
-                        "execute_mimic_query",
-                        {
-                            "sql_query": "SELECT COUNT(*) FROM `physionet-data.mimiciv_3_1_icu.icustays`"
-                        },
-                    )
-                    result_text = str(result)
-                    assert "Mock BigQuery result" in result_text
-
-                    # Test get_race_distribution tool
-                    result = await client.call_tool(
-                        "get_race_distribution", {"limit": 5}
-                    )
-                    result_text = str(result)
-                    assert "Mock BigQuery result" in result_text
-
-                    # Verify BigQuery client was called
-                    mock_client.assert_called_once_with(project="test-project")
-                    assert mock_client_instance.query.called
+        set_env(BIGQUERY_ENV)
+        _init_backend()
+
+        async with Client(mcp) as client:
+            query, race_distribution = await asyncio.gather(
+                client.call_tool(
+                    "execute_mimic_query",
+                    {
+                        "sql_query": "SELECT COUNT(*) FROM `physionet-data.mimiciv_3_1_icu.icustays`"
+                    },
+                ),
+                client.call_tool("get_race_distribution", {"limit": 5}),
+            )
+
+            # Test execute_mimic_query tool
+            assert "Mock BigQuery result" in _result_text(query)
+
+            # Test get_race_distribution tool
+            assert "Mock BigQuery result" in _result_text(race_distribution)
+
+            # Verify BigQuery client was called
+            bq_mock.assert_called_once_with(project="test-project")
+            assert bq_mock.return_value.query.called
 
 
 class TestServerIntegration:
@@ -351,8 +317,6 @@ class TestServerIntegration:
 
     def test_server_main_function_exists(self):
         """Test that the main function exists and is callable."""
-        from m3.mcp_server import main
-
         assert callable(main)
 
     def test_server_can_be_imported_as_module(self):
@@ -2,11 +2,9 @@
 Basic OAuth2 authentication tests.
 """
 
-import os
-from unittest.mock import patch
-
 import pytest
 
+import m3.auth
 from m3.auth import (
     OAuth2Config,
     init_oauth2,
@@ -14,17 +12,26 @@ from m3.auth import (
     require_oauth2,
 )
 
+# Keep host M3_OAUTH2_* settings out of every test
+pytestmark = pytest.mark.usefixtures("clean_m3_env")
+
+
+@pytest.fixture(autouse=True)
+def reset_oauth2_state(monkeypatch):
+    """Give every test fresh m3.auth globals and restore them afterwards."""
+    monkeypatch.setattr(m3.auth, "_oauth2_config", None)
+    monkeypatch.setattr(m3.auth, "_oauth2_validator", None)
+
 
 class TestOAuth2BasicConfig:
     """Test basic OAuth2 configuration."""
 
     def test_oauth2_disabled_by_default(self):
         """Test that OAuth2 is disabled by default."""
-        with patch.dict(os.environ, {}, clear=True):
-            config = OAuth2Config()
-            assert not config.enabled
+        config = OAuth2Config()
+        assert not config.enabled
 
-    def test_oauth2_enabled_configuration(self):
+    def test_oauth2_enabled_configuration(self, set_env):
         """Test OAuth2 enabled configuration."""
         env_vars = {
             "M3_OAUTH2_ENABLED": "true",
@@ -33,20 +40,20 @@ class TestOAuth2BasicConfig:
             "M3_OAUTH2_REQUIRED_SCOPES": "read:mimic-data,write:mimic-data",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            config = OAuth2Config()
-            assert config.enabled
-            assert config.issuer_url == "https://auth.example.com"
-            assert config.audience == "m3-api"
-            assert config.required_scopes == {"read:mimic-data", "write:mimic-data"}
+        set_env(env_vars)
+        config = OAuth2Config()
+        assert config.enabled
+        assert config.issuer_url == "https://auth.example.com"
+        assert config.audience == "m3-api"
+        assert config.required_scopes == {"read:mimic-data", "write:mimic-data"}
 
-    def test_oauth2_invalid_configuration_raises_error(self):
+    def test_oauth2_invalid_configuration_raises_error(self, monkeypatch):
         """Test that invalid OAuth2 configuration raises an error."""
-        with patch.dict(os.environ, {"M3_OAUTH2_ENABLED": "true"}, clear=True):
-            with pytest.raises(ValueError, match="M3_OAUTH2_ISSUER_URL is required"):
-                OAuth2Config()
+        monkeypatch.setenv("M3_OAUTH2_ENABLED", "true")
+        with pytest.raises(ValueError, match="M3_OAUTH2_ISSUER_URL is required"):
+            OAuth2Config()
 
-    def test_jwks_url_auto_discovery(self):
+    def test_jwks_url_auto_discovery(self, set_env):
         """Test automatic JWKS URL discovery."""
         env_vars = {
             "M3_OAUTH2_ENABLED": "true",
@@ -54,9 +61,9 @@ class TestOAuth2BasicConfig:
             "M3_OAUTH2_AUDIENCE": "m3-api",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            config = OAuth2Config()
-            assert config.jwks_url == "https://auth.example.com/.well-known/jwks.json"
+        set_env(env_vars)
+        config = OAuth2Config()
+        assert config.jwks_url == "https://auth.example.com/.well-known/jwks.json"
 
     def test_scope_parsing(self):
         """Test scope parsing from environment variable."""
@@ -76,11 +83,10 @@ class TestOAuth2BasicIntegration:
 
     def test_init_oauth2_disabled(self):
         """Test OAuth2 initialization when disabled."""
-        with patch.dict(os.environ, {}, clear=True):
-            init_oauth2()
-            assert not is_oauth2_enabled()
+        init_oauth2()
+        assert not is_oauth2_enabled()
 
-    def test_init_oauth2_enabled(self):
+    def test_init_oauth2_enabled(self, set_env):
         """Test OAuth2 initialization when enabled."""
         env_vars = {
             "M3_OAUTH2_ENABLED": "true",
@@ -88,22 +94,14 @@ class TestOAuth2BasicIntegration:
             "M3_OAUTH2_AUDIENCE": "m3-api",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            init_oauth2()
-            assert is_oauth2_enabled()
+        set_env(env_vars)
+        init_oauth2()
+        assert is_oauth2_enabled()
 
 
 class TestOAuth2BasicDecorator:
     """Test basic OAuth2 decorator functionality."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Reset global state
-        import m3.auth
-
-        m3.auth._oauth2_config = None
-        m3.auth._oauth2_validator = None
-
     def test_decorator_with_oauth2_disabled(self):
         """Test decorator behavior when OAuth2 is disabled."""
 
@@ -111,14 +109,13 @@ class TestOAuth2BasicDecorator:
         def test_function():
             return "success"
 
-        with patch.dict(os.environ, {}, clear=True):
-            init_oauth2()
+        init_oauth2()
 
-            # Should allow access when OAuth2 is disabled
-            result = test_function()
-            assert result == "success"
+        # Should allow access when OAuth2 is disabled
+        result = test_function()
+        assert result == "success"
 
-    def test_decorator_with_missing_token(self):
+    def test_decorator_with_missing_token(self, set_env):
         """Test decorator behavior with missing token."""
 
         @require_oauth2
@@ -131,14 +128,14 @@ class TestOAuth2BasicDecorator:
             "M3_OAUTH2_AUDIENCE": "m3-api",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            init_oauth2()
+        set_env(env_vars)
+        init_oauth2()
 
-            # Should return error when token is missing
-            result = test_function()
-            assert "Missing OAuth2 access token" in result
+        # Should return error when token is missing
+        result = test_function()
+        assert "Missing OAuth2 access token" in result
 
-    def test_decorator_with_invalid_token_format(self):
+    def test_decorator_with_invalid_token_format(self, set_env):
         """Test decorator behavior with invalid token format."""
 
         @require_oauth2
@@ -152,14 +149,14 @@ class TestOAuth2BasicDecorator:
             "M3_OAUTH2_TOKEN": "invalid-token",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            init_oauth2()
+        set_env(env_vars)
+        init_oauth2()
 
-            # Should return error with invalid token format
-            result = test_function()
-            assert "Invalid token format" in result
+        # Should return error with invalid token format
+        result = test_function()
+        assert "Invalid token format" in result
 
-    def test_decorator_with_valid_jwt_format(self):
+    def test_decorator_with_valid_jwt_format(self, set_env):
         """Test decorator behavior with valid JWT format."""
 
         @require_oauth2
@@ -176,14 +173,14 @@ class TestOAuth2BasicDecorator:
             "M3_OAUTH2_TOKEN": f"Bearer {valid_jwt}",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            init_oauth2()
+        set_env(env_vars)
+        init_oauth2()
 
-            # Should work with valid JWT format
-            result = test_function()
-            assert result == "success"
+        # Should work with valid JWT format
+        result = test_function()
+        assert result == "success"
 
-    def test_decorator_with_bearer_prefix_removal(self):
+    def test_decorator_with_bearer_prefix_removal(self, set_env):
         """Test that Bearer prefix is correctly removed."""
 
         @require_oauth2
@@ -200,9 +197,9 @@ class TestOAuth2BasicDecorator:
             "M3_OAUTH2_TOKEN": f"Bearer {valid_jwt}",
         }
 
-        with patch.dict(os.environ, env_vars, clear=True):
-            init_oauth2()
+        set_env(env_vars)
+        init_oauth2()
 
-            # Should work even with Bearer prefix
-            result = test_function()
-            assert result == "success"
+        # Should work even with Bearer prefix
+        result = test_function()
+        assert result == "success"